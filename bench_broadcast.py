@@ -0,0 +1,54 @@
+"""Benchmark broadcast throughput against the fake Bot API server.
+
+Usage: python bench_broadcast.py [--users 300] [--rate 30] [--latency 0.05] [--flood-every 0]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from telegram import Bot
+from telegram.request import HTTPXRequest
+
+import broadcast
+from fake_bot_api import FakeBotAPI, FakeStore
+
+
+async def bench(args):
+    api = FakeBotAPI(latency=args.latency, flood_every=args.flood_every).start()
+    store = FakeStore(args.users)
+    progress_file = os.path.join(tempfile.mkdtemp(), broadcast.PROGRESS_FILE)
+    scheduler = broadcast.SendScheduler(global_rate=args.rate)
+
+    try:
+        # Application uses a large connection pool too; a bare Bot defaults to one connection
+        request = HTTPXRequest(connection_pool_size=broadcast.BATCH_SIZE)
+        async with Bot('123:fake', base_url=api.base_url, request=request) as bot:
+            started = time.monotonic()
+            result = await broadcast.run_broadcast(
+                bot, store, "📣 Benchmark message",
+                scheduler=scheduler, progress_file=progress_file
+            )
+            elapsed = time.monotonic() - started
+    finally:
+        api.stop()
+
+    print(f"Users:      {args.users}")
+    print(f"Delivered:  {result['sent']}")
+    print(f"Failed:     {result['failed']}")
+    print(f"Requests:   {api.requests}")
+    print(f"Elapsed:    {elapsed:.2f}s")
+    print(f"Throughput: {result['sent'] / elapsed:.1f} messages/sec (limit {args.rate}/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--rate', type=float, default=broadcast.GLOBAL_RATE)
+    parser.add_argument('--latency', type=float, default=0.05, help='fake server response delay in seconds')
+    parser.add_argument('--flood-every', type=int, default=0, help='answer every Nth sendMessage with 429')
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Benchmark cold start for each deploy role.
+
+For every role this reports the `python -X importtime` breakdown of its
+entry module and the wall time from process start until the first
+request is handled:
+  web - until GET /api/user/<id> answers
+  bot - until a queued /start update gets a reply (via the fake Bot API)
+  all - both of the above, measured on the bot reply
+
+Usage: python bench_startup.py [--runs 3] [--top 8] [--role web|bot|all]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from fake_bot_api import FakeBotAPI
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+ROLES = {
+    'web': {'module': 'casino_web', 'args': [os.path.join(HERE, 'casino_web.py')]},
+    'bot': {'module': 'casino_miniapp_bot', 'args': [os.path.join(HERE, 'casino_miniapp_bot.py'), 'bot']},
+    'all': {'module': 'casino_miniapp_bot, casino_web', 'args': [os.path.join(HERE, 'casino_miniapp_bot.py'), 'all']},
+}
+
+TIMEOUT = 30
+
+
+def import_times(module):
+    """Return (total_us, [(cumulative_us, name)]) for the direct imports of module
+
+    importtime lists children before their parent, indented two spaces per level.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=tempfile.mkdtemp(), env=_env(), capture_output=True, text=True
+    )
+    entry_modules = [m.strip() for m in module.split(',')]
+    total = 0
+    children = []
+    breakdown = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        total += int(self_us)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative_us), name.strip()))
+        elif depth == 0:
+            if name.strip() in entry_modules:
+                breakdown.extend(children)
+            children = []
+    return total, sorted(breakdown, reverse=True)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _env(**extra):
+    env = dict(os.environ, PYTHONPATH=HERE)
+    env.update(extra)
+    return env
+
+
+def time_to_first_request(role):
+    """Seconds from spawning the role's process to its first handled request"""
+    workdir = tempfile.mkdtemp()
+    port = free_port()
+    api = None
+    env = _env(PORT=str(port))
+    if role in ('bot', 'all'):
+        api = FakeBotAPI().start()
+        api.queue_command(424242, '/start')
+        env.update(BOT_TOKEN='123:fake', BOT_API_URL=api.base_url)
+
+    started = time.monotonic()
+    proc = subprocess.Popen(
+        [sys.executable] + ROLES[role]['args'], cwd=workdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = started + TIMEOUT
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{role} process exited with code {proc.returncode}")
+            if api is not None:
+                if api.message_sent.wait(0.005):
+                    return time.monotonic() - started
+            else:
+                try:
+                    with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/user/424242', timeout=1):
+                        return time.monotonic() - started
+                except OSError:
+                    time.sleep(0.005)
+        raise RuntimeError(f"{role} did not handle a request within {TIMEOUT}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+        if api is not None:
+            api.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8, help='number of direct imports to list')
+    parser.add_argument('--role', choices=list(ROLES), action='append')
+    args = parser.parse_args()
+
+    for role in args.role or list(ROLES):
+        module = ROLES[role]['module']
+        total, breakdown = import_times(module)
+        print(f"== {role} ({module}) ==")
+        print(f"Import time: {total / 1000:.1f} ms")
+        for cumulative, name in breakdown[:args.top]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+        timings = sorted(time_to_first_request(role) for _ in range(args.runs))
+        print(f"Time to first handled request: {timings[len(timings) // 2]:.2f}s median "
+              f"(min {timings[0]:.2f}s, max {timings[-1]:.2f}s, {args.runs} runs)")
+        print()
+
+
+if __name__ == '__main__':
+    main()
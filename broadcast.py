@@ -0,0 +1,305 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+from telegram import Update
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+from telegram.ext import ContextTypes
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows roughly 30 messages/second across all chats and 1 message/second per chat
+GLOBAL_RATE = 30
+PER_CHAT_RATE = 1
+
+BATCH_SIZE = 30
+MAX_RETRIES = 5
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+
+PROGRESS_FILE = 'broadcast_progress.json'
+
+# Idle per-chat buckets are dropped once this many are held
+MAX_CHAT_BUCKETS = 100
+
+# BadRequest descriptions that only concern one chat; any other BadRequest is a problem with the message itself
+CHAT_ERRORS = ('chat not found', 'user not found', 'peer_id_invalid')
+
+
+class BroadcastInterrupted(Exception):
+    """Raised when a broadcast stops early for shutdown; the checkpoint is kept"""
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        # Small capacity keeps sends evenly spaced instead of bursting past the limit
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    async def pause(self, seconds):
+        """Drain the bucket so nobody sends for the given time (used on 429)"""
+        async with self.lock:
+            self.tokens = 0
+            self.updated = time.monotonic() + seconds
+
+
+class SendScheduler:
+    def __init__(self, global_rate=GLOBAL_RATE, per_chat_rate=PER_CHAT_RATE):
+        self.global_bucket = TokenBucket(global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.chat_buckets = {}
+
+    async def acquire(self, chat_id):
+        """Wait for both the per-chat and the global limit"""
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= MAX_CHAT_BUCKETS:
+                self._prune_chat_buckets()
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.per_chat_rate)
+        await bucket.acquire()
+        await self.global_bucket.acquire()
+
+    def _prune_chat_buckets(self):
+        """Drop buckets that have refilled, a new bucket would behave the same"""
+        cutoff = time.monotonic() - 1 / self.per_chat_rate
+        for chat_id, bucket in list(self.chat_buckets.items()):
+            if bucket.updated <= cutoff and not bucket.lock.locked():
+                del self.chat_buckets[chat_id]
+
+    async def send_message(self, bot, chat_id, text):
+        """Send one message, retrying on flood control and network errors.
+
+        Returns True if delivered, False if the chat can't be reached.
+        Other BadRequests (bad entities, text too long) are raised, since they
+        would fail the same way for every user.
+        """
+        for attempt in range(MAX_RETRIES):
+            await self.acquire(chat_id)
+            try:
+                await bot.send_message(chat_id=chat_id, text=text)
+                return True
+            except RetryAfter as e:
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                logger.warning("Flood control hit, pausing broadcast for %ss", delay)
+                await self.global_bucket.pause(delay)
+            except Forbidden as e:
+                # User blocked the bot or deleted their account
+                logger.info("Skipping chat %s: %s", chat_id, e)
+                return False
+            except BadRequest as e:
+                if not any(err in e.message.lower() for err in CHAT_ERRORS):
+                    raise
+                logger.info("Skipping chat %s: %s", chat_id, e)
+                return False
+            except NetworkError as e:
+                delay = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt)
+                logger.warning("Network error sending to %s (%s), retrying in %ss", chat_id, e, delay)
+                await asyncio.sleep(delay)
+        logger.error("Giving up on chat %s after %s attempts", chat_id, MAX_RETRIES)
+        return False
+
+
+def load_progress(progress_file=PROGRESS_FILE):
+    """Load broadcast checkpoint, or None if there is no unfinished broadcast"""
+    try:
+        with open(progress_file, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_progress(progress, progress_file=PROGRESS_FILE):
+    """Save broadcast checkpoint atomically"""
+    tmp_file = progress_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(progress, f, indent=2)
+    os.replace(tmp_file, progress_file)
+
+
+def clear_progress(progress_file=PROGRESS_FILE):
+    """Remove broadcast checkpoint"""
+    try:
+        os.remove(progress_file)
+    except FileNotFoundError:
+        pass
+
+
+async def run_broadcast(bot, casino, text, progress=None, scheduler=None,
+                        progress_file=PROGRESS_FILE, batch_size=BATCH_SIZE, should_stop=None):
+    """Send text to every user, checkpointing after each batch.
+
+    Pass a progress dict from load_progress() to resume an interrupted broadcast.
+    Users already handled in a batch that failed are recorded and skipped on
+    resume; only a hard kill mid-batch can make a resume send to someone twice.
+    should_stop is checked between batches; when it returns True the checkpoint
+    is kept and BroadcastInterrupted is raised.
+    """
+    if progress is None:
+        progress = {'text': text, 'offset': 0, 'sent': 0, 'failed': 0}
+    if scheduler is None:
+        scheduler = SendScheduler()
+    # Checkpoint up front so a failure in the first batch can still be resumed or discarded
+    save_progress(progress, progress_file)
+
+    batch = []
+    for user_id in casino.iter_user_ids(offset=progress['offset']):
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            await _send_batch(bot, scheduler, batch, progress, progress_file)
+            save_progress(progress, progress_file)
+            batch = []
+            if should_stop is not None and should_stop():
+                raise BroadcastInterrupted(f"stopped after {progress['offset']} users")
+    if batch:
+        await _send_batch(bot, scheduler, batch, progress, progress_file)
+
+    clear_progress(progress_file)
+    return progress
+
+
+async def _send_batch(bot, scheduler, batch, progress, progress_file):
+    # Users handled before an earlier attempt at this batch failed
+    done = set(progress.get('batch_done', []))
+    pending = [user_id for user_id in batch if user_id not in done]
+
+    # Let the whole batch settle before raising so no sends are left running in the background
+    results = await asyncio.gather(
+        *(scheduler.send_message(bot, int(user_id), progress['text']) for user_id in pending),
+        return_exceptions=True
+    )
+
+    error = None
+    for user_id, result in zip(pending, results):
+        if isinstance(result, BaseException):
+            error = error or result
+            continue
+        progress['sent' if result else 'failed'] += 1
+        done.add(user_id)
+
+    if error is not None:
+        progress['batch_done'] = sorted(done)
+        save_progress(progress, progress_file)
+        raise error
+
+    progress.pop('batch_done', None)
+    progress['offset'] += len(batch)
+
+
+def is_admin(user_id):
+    """Check user against ADMIN_IDS (comma-separated Telegram user ids)"""
+    admin_ids = os.getenv('ADMIN_IDS', '')
+    return str(user_id) in [a.strip() for a in admin_ids.split(',') if a.strip()]
+
+
+async def handle_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE, casino) -> None:
+    """Admin broadcast command: /broadcast <message>, /broadcast resume or /broadcast discard"""
+    if not is_admin(update.effective_user.id):
+        return
+
+    # Split on any whitespace so a newline right after the command works, keeping newlines in the body
+    parts = update.effective_message.text.split(None, 1)
+    text = parts[1].strip() if len(parts) > 1 else ''
+    if not text:
+        await update.effective_message.reply_text(
+            "📣 Usage: /broadcast [message]\n"
+            "Use /broadcast resume to continue an interrupted broadcast\n"
+            "Use /broadcast discard to drop it"
+        )
+        return
+
+    if len(text) > MessageLimit.MAX_TEXT_LENGTH:
+        await update.effective_message.reply_text(
+            f"🚫 Message is too long ({len(text)} characters, max {MessageLimit.MAX_TEXT_LENGTH})."
+        )
+        return
+
+    if context.bot_data.get('broadcast_running'):
+        await update.effective_message.reply_text("📣 A broadcast is already running!")
+        return
+
+    progress = load_progress()
+
+    if text == 'discard':
+        if progress is None:
+            await update.effective_message.reply_text("📣 No interrupted broadcast to discard.")
+            return
+        clear_progress()
+        await update.effective_message.reply_text(f"🗑 Discarded the unfinished broadcast ({progress['offset']} users were already sent to).")
+        return
+
+    if text == 'resume':
+        if progress is None:
+            await update.effective_message.reply_text("📣 No interrupted broadcast to resume.")
+            return
+        text = progress['text']
+        await update.effective_message.reply_text(f"📣 Resuming broadcast from user #{progress['offset']}...")
+    else:
+        if progress is not None:
+            # Starting over would overwrite the checkpoint and lose track of who still needs it
+            await update.effective_message.reply_text(
+                f"📣 An unfinished broadcast stopped after {progress['offset']} users.\n"
+                f"Use /broadcast resume to finish it, or /broadcast discard to drop it before starting a new one."
+            )
+            return
+        await update.effective_message.reply_text(f"📣 Broadcasting to {len(casino.users)} users...")
+
+    async def broadcast_job():
+        started = time.monotonic()
+        try:
+            # Application.stop() waits for this task, so finish the current batch and let it shut down
+            result = await run_broadcast(
+                context.bot, casino, text, progress=progress,
+                should_stop=lambda: not context.application.running
+            )
+        except BroadcastInterrupted as e:
+            logger.info("Broadcast %s for shutdown, use /broadcast resume after restart", e)
+            return
+        except BadRequest as e:
+            # Problem with the message itself, resuming would send the same text and fail again
+            logger.exception("Broadcast rejected by Telegram")
+            await update.effective_message.reply_text(
+                f"🚫 Telegram rejected the broadcast message: {e}\n"
+                f"Use /broadcast discard, then start a new broadcast with a fixed message."
+            )
+            return
+        except Exception as e:
+            logger.exception("Broadcast failed")
+            await update.effective_message.reply_text(
+                f"🚫 Broadcast stopped with an error: {e}\n"
+                f"Use /broadcast resume to retry, or /broadcast discard to drop it."
+            )
+            return
+        finally:
+            context.bot_data['broadcast_running'] = False
+        elapsed = time.monotonic() - started
+        await update.effective_message.reply_text(
+            f"✅ Broadcast finished in {elapsed:.1f}s\n"
+            f"📬 Delivered: {result['sent']}\n"
+            f"🚫 Failed: {result['failed']}"
+        )
+
+    # Run in the background so other handlers keep responding
+    context.bot_data['broadcast_running'] = True
+    context.application.create_task(broadcast_job(), update=update)
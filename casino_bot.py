@@ -1,12 +1,13 @@
-import json
 import os
+import sys
+import random
 import logging
 from datetime import datetime
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ContextTypes
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, jsonify
-import threading
+import broadcast
+from casino_store import casino
 
 # Load environment variables
 load_dotenv()
@@ -22,53 +23,6 @@ logger = logging.getLogger(__name__)
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 WEBAPP_URL = os.getenv('WEBAPP_URL', 'https://your-domain.com')  # Replace with your actual domain
 
-class CasinoBot:
-    def __init__(self):
-        self.data_file = 'casino_data.json'
-        self.load_data()
-    
-    def load_data(self):
-        """Load user data from JSON file"""
-        try:
-            with open(self.data_file, 'r') as f:
-                self.users = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.users = {}
-    
-    def save_data(self):
-        """Save user data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.users, f, indent=2)
-    
-    def get_user(self, user_id):
-        """Get or create user data"""
-        user_id = str(user_id)
-        if user_id not in self.users:
-            self.users[user_id] = {
-                'balance': 1000,  # Starting balance
-                'total_winnings': 0,
-                'total_losses': 0,
-                'games_played': 0,
-                'last_daily': None
-            }
-            self.save_data()
-        return self.users[user_id]
-    
-    def update_balance(self, user_id, amount):
-        """Update user balance"""
-        user = self.get_user(user_id)
-        user['balance'] += amount
-        if amount > 0:
-            user['total_winnings'] += amount
-        else:
-            user['total_losses'] += abs(amount)
-        user['games_played'] += 1
-        self.save_data()
-        return user['balance']
-
-# Initialize casino bot
-casino = CasinoBot()
-
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Start command handler"""
     user = casino.get_user(update.effective_user.id)
@@ -121,7 +75,8 @@ async def daily(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = casino.get_user(update.effective_user.id)
     today = datetime.now().strftime('%Y-%m-%d')
     
-    if user['last_daily'] == today:
+    # Users created by the Mini App bot have no last_daily yet
+    if user.get('last_daily') == today:
         await update.message.reply_text("🚫 You've already claimed your daily bonus today! Come back tomorrow.")
         return
     
@@ -389,6 +344,10 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     """Help command"""
     await start(update, context)
 
+async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Admin command to message every user"""
+    await broadcast.handle_broadcast(update, context, casino)
+
 def main() -> None:
     """Start the bot"""
     if not BOT_TOKEN:
@@ -396,6 +355,11 @@ def main() -> None:
         print("Please set your bot token in the .env file")
         return
     
+    try:
+        casino.claim_data_file()
+    except RuntimeError as e:
+        sys.exit(f"Error: {e}")
+    
     # Create the Application
     application = Application.builder().token(BOT_TOKEN).build()
     
@@ -409,6 +373,7 @@ def main() -> None:
     application.add_handler(CommandHandler("dice", dice))
     application.add_handler(CommandHandler("coinflip", coinflip))
     application.add_handler(CommandHandler("blackjack", blackjack))
+    application.add_handler(CommandHandler("broadcast", broadcast_command))
     
     # Run the bot
     print("Casino Bot is starting...")
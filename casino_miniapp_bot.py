@@ -1,12 +1,11 @@
-import json
 import os
+import sys
 import logging
-from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, jsonify
-import threading
+import broadcast
+from casino_store import casino
 
 # Load environment variables
 load_dotenv()
@@ -21,94 +20,8 @@ logger = logging.getLogger(__name__)
 # Bot token from environment variable
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 WEBAPP_URL = os.getenv('WEBAPP_URL', 'http://localhost:5000')  # Local development URL
-
-class CasinoBot:
-    def __init__(self):
-        self.data_file = 'casino_data.json'
-        self.load_data()
-    
-    def load_data(self):
-        """Load user data from JSON file"""
-        try:
-            with open(self.data_file, 'r') as f:
-                self.users = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.users = {}
-    
-    def save_data(self):
-        """Save user data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.users, f, indent=2)
-    
-    def get_user(self, user_id):
-        """Get or create user data"""
-        user_id = str(user_id)
-        if user_id not in self.users:
-            self.users[user_id] = {
-                'balance': 1000,  # Starting balance
-                'total_winnings': 0,
-                'total_losses': 0,
-                'games_played': 0
-            }
-            self.save_data()
-        return self.users[user_id]
-    
-    def update_balance(self, user_id, amount):
-        """Update user balance"""
-        user = self.get_user(user_id)
-        user['balance'] += amount
-        if amount > 0:
-            user['total_winnings'] += amount
-        else:
-            user['total_losses'] += abs(amount)
-        user['games_played'] += 1
-        self.save_data()
-        return user['balance']
-
-# Initialize casino bot
-casino = CasinoBot()
-
-# Flask app for Mini App
-app = Flask(__name__)
-
-@app.route('/')
-def index():
-    """Serve the main casino Mini App page"""
-    return render_template('casino.html')
-
-@app.route('/api/user/<user_id>')
-def get_user_data(user_id):
-    """API endpoint to get user data"""
-    user = casino.get_user(user_id)
-    return jsonify(user)
-
-@app.route('/api/play', methods=['POST'])
-def play_game():
-    """API endpoint to handle game results"""
-    data = request.json
-    user_id = data.get('user_id')
-    game_type = data.get('game_type')
-    bet_amount = data.get('bet_amount', 0)
-    result = data.get('result', 'loss')
-    
-    # Calculate winnings based on result
-    if result == 'win':
-        winnings = bet_amount
-    elif result == 'big_win':
-        winnings = bet_amount * 2
-    elif result == 'jackpot':
-        winnings = bet_amount * 10
-    else:
-        winnings = -bet_amount
-    
-    # Update user balance
-    new_balance = casino.update_balance(user_id, winnings)
-    
-    return jsonify({
-        'success': True,
-        'new_balance': new_balance,
-        'winnings': winnings
-    })
+# Optional Bot API server URL (local Bot API server or the fake one used by benchmarks)
+BOT_API_URL = os.getenv('BOT_API_URL')
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Start command handler"""
@@ -233,36 +146,62 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     """Help command"""
     await start(update, context)
 
-def run_flask():
-    """Run Flask app in a separate thread"""
-    port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Admin command to message every user"""
+    await broadcast.handle_broadcast(update, context, casino)
+
+def build_application():
+    """Create the Application and register handlers"""
+    builder = Application.builder().token(BOT_TOKEN)
+    if BOT_API_URL:
+        builder = builder.base_url(BOT_API_URL)
+    application = builder.build()
+    
+    # Register handlers
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("help", help_command))
+    application.add_handler(CommandHandler("balance", balance_command))
+    application.add_handler(CommandHandler("stats", stats_command))
+    application.add_handler(CommandHandler("broadcast", broadcast_command))
+    application.add_handler(CallbackQueryHandler(button_handler))
+    return application
 
 def main() -> None:
-    """Start the bot and Flask server"""
+    """Start the bot, plus the Flask server unless run with the 'bot' role
+
+    Usage: python casino_miniapp_bot.py [all|bot]
+    The web-only role is `python casino_web.py`.
+    """
+    role = sys.argv[1] if len(sys.argv) > 1 else 'all'
+    if role not in ('all', 'bot'):
+        sys.exit(f"Error: unknown role '{role}', expected 'all' or 'bot'")
+    
     if not BOT_TOKEN:
         print("Error: BOT_TOKEN not found in environment variables!")
         print("Please set your bot token in the .env file")
         return
     
-    # Start Flask server in a separate thread
-    flask_thread = threading.Thread(target=run_flask, daemon=True)
-    flask_thread.start()
+    try:
+        casino.claim_data_file()
+    except RuntimeError as e:
+        sys.exit(f"Error: {e}")
     
-    # Create the Application
-    application = Application.builder().token(BOT_TOKEN).build()
+    if role == 'all':
+        # Imported here so the bot-only role doesn't pay for Flask
+        import threading
+        from casino_web import run_flask
+        
+        # Start Flask server in a separate thread
+        flask_thread = threading.Thread(target=run_flask, daemon=True)
+        flask_thread.start()
     
-    # Register handlers
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("help", help_command))
-    application.add_handler(CommandHandler("balance", balance_command))
-    application.add_handler(CommandHandler("stats", stats_command))
-    application.add_handler(CallbackQueryHandler(button_handler))
+    application = build_application()
     
     # Run the bot
     print("Casino Mini App Bot is starting...")
-    print(f"Flask server running on {WEBAPP_URL}")
+    if role == 'all':
+        print(f"Flask server running on {WEBAPP_URL}")
     application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
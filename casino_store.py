@@ -0,0 +1,96 @@
+import json
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows, no advisory locks
+    fcntl = None
+
+
+class CasinoBot:
+    def __init__(self):
+        self.data_file = 'casino_data.json'
+        self._users = None
+        # The Flask thread and the bot event loop share this store in the combined role
+        self._load_lock = threading.Lock()
+        self._lock_file = None
+
+    @property
+    def users(self):
+        """User data, loaded from the JSON file on first access"""
+        if self._users is None:
+            with self._load_lock:
+                if self._users is None:
+                    self.claim_data_file()
+                    self.load_data()
+        return self._users
+
+    def claim_data_file(self):
+        """Make sure no other process is using the same data file.
+
+        Each process caches all users and save_data() writes the whole cache
+        back, so two processes on one file would overwrite each other's updates.
+        Entrypoints call this at startup so a second process exits right away.
+        """
+        if fcntl is None or self._lock_file is not None:
+            return
+        lock_file = open(self.data_file + '.lock', 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(
+                f"{self.data_file} is already in use by another process. "
+                f"Run the bot and web roles together with `python casino_miniapp_bot.py`."
+            )
+        # Held open for the life of the process
+        self._lock_file = lock_file
+
+    def load_data(self):
+        """Load user data from JSON file"""
+        try:
+            with open(self.data_file, 'r') as f:
+                users = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            users = {}
+        # Assign once fully loaded so other threads never see a partial dict
+        self._users = users
+
+    def save_data(self):
+        """Save user data to JSON file"""
+        with open(self.data_file, 'w') as f:
+            json.dump(self.users, f, indent=2)
+
+    def get_user(self, user_id):
+        """Get or create user data"""
+        user_id = str(user_id)
+        if user_id not in self.users:
+            self.users[user_id] = {
+                'balance': 1000,  # Starting balance
+                'total_winnings': 0,
+                'total_losses': 0,
+                'games_played': 0
+            }
+            self.save_data()
+        return self.users[user_id]
+
+    def update_balance(self, user_id, amount):
+        """Update user balance"""
+        user = self.get_user(user_id)
+        user['balance'] += amount
+        if amount > 0:
+            user['total_winnings'] += amount
+        else:
+            user['total_losses'] += abs(amount)
+        user['games_played'] += 1
+        self.save_data()
+        return user['balance']
+
+    def iter_user_ids(self, offset=0):
+        """Iterate over user ids in storage order, starting at offset"""
+        # Snapshot the keys so users joining mid-iteration don't break it
+        for user_id in list(self.users)[offset:]:
+            yield user_id
+
+# Shared store, data is loaded when a handler first needs it
+casino = CasinoBot()
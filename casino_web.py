@@ -0,0 +1,71 @@
+import os
+import sys
+import logging
+from flask import Flask, render_template, request, jsonify
+from dotenv import load_dotenv
+from casino_store import casino
+
+# Load environment variables
+load_dotenv()
+
+# Enable logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Flask app for Mini App
+app = Flask(__name__)
+
+@app.route('/')
+def index():
+    """Serve the main casino Mini App page"""
+    return render_template('casino.html')
+
+@app.route('/api/user/<user_id>')
+def get_user_data(user_id):
+    """API endpoint to get user data"""
+    user = casino.get_user(user_id)
+    return jsonify(user)
+
+@app.route('/api/play', methods=['POST'])
+def play_game():
+    """API endpoint to handle game results"""
+    data = request.json
+    user_id = data.get('user_id')
+    game_type = data.get('game_type')
+    bet_amount = data.get('bet_amount', 0)
+    result = data.get('result', 'loss')
+
+    # Calculate winnings based on result
+    if result == 'win':
+        winnings = bet_amount
+    elif result == 'big_win':
+        winnings = bet_amount * 2
+    elif result == 'jackpot':
+        winnings = bet_amount * 10
+    else:
+        winnings = -bet_amount
+
+    # Update user balance
+    new_balance = casino.update_balance(user_id, winnings)
+
+    return jsonify({
+        'success': True,
+        'new_balance': new_balance,
+        'winnings': winnings
+    })
+
+def run_flask():
+    """Run the Mini App web server"""
+    port = int(os.environ.get('PORT', 5000))
+    app.run(host='0.0.0.0', port=port, debug=False)
+
+if __name__ == '__main__':
+    # Web-only role: serves the Mini App and API without the Telegram bot
+    try:
+        casino.claim_data_file()
+    except RuntimeError as e:
+        sys.exit(f"Error: {e}")
+    run_flask()
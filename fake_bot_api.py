@@ -0,0 +1,140 @@
+"""Minimal fake Telegram Bot API server for local benchmarking.
+
+Answers getMe, sendMessage and the polling calls like the real API, and
+can inject 429 flood-control errors to exercise the retry path.
+FakeStore stands in for the user store with generated user ids.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class FakeStore:
+    def __init__(self, count):
+        self.users = {str(100000 + i): {} for i in range(count)}
+
+    def iter_user_ids(self, offset=0):
+        for user_id in list(self.users)[offset:]:
+            yield user_id
+
+
+class FakeBotAPI:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, flood_every=0, retry_after=1):
+        self.latency = latency
+        self.flood_every = flood_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.messages = []
+        self.updates = []
+        self.message_sent = threading.Event()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        """Value to pass as base_url to telegram.Bot"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def queue_command(self, chat_id, command):
+        """Queue a private chat command to be returned by getUpdates"""
+        with self.lock:
+            update_id = len(self.updates) + 1
+            self.updates.append({
+                'update_id': update_id,
+                'message': {
+                    'message_id': update_id,
+                    'date': int(time.time()),
+                    'chat': {'id': chat_id, 'type': 'private'},
+                    'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Bench'},
+                    'text': command,
+                    'entities': [{'type': 'bot_command', 'offset': 0, 'length': len(command.split()[0])}]
+                }
+            })
+
+    def handle(self, method, params):
+        """Return (status, payload) for a Bot API call"""
+        if self.latency:
+            time.sleep(self.latency)
+
+        if method == 'getMe':
+            return 200, {'ok': True, 'result': {
+                'id': 1, 'is_bot': True, 'first_name': 'Fake Casino', 'username': 'fake_casino_bot'
+            }}
+
+        if method == 'deleteWebhook':
+            return 200, {'ok': True, 'result': True}
+
+        if method == 'getUpdates':
+            offset = int(params.get('offset') or 0)
+            with self.lock:
+                pending = [u for u in self.updates if u['update_id'] >= offset]
+            if not pending:
+                # Stand in for long polling without holding the connection open
+                time.sleep(0.1)
+            return 200, {'ok': True, 'result': pending}
+
+        if method == 'sendMessage':
+            with self.lock:
+                self.requests += 1
+                flood = self.flood_every and self.requests % self.flood_every == 0
+                if not flood:
+                    self.messages.append((int(params['chat_id']), params['text']))
+                    message_id = len(self.messages)
+                    self.message_sent.set()
+            if flood:
+                return 429, {'ok': False, 'error_code': 429,
+                             'description': f"Too Many Requests: retry after {self.retry_after}",
+                             'parameters': {'retry_after': self.retry_after}}
+            return 200, {'ok': True, 'result': {
+                'message_id': message_id,
+                'date': int(time.time()),
+                'chat': {'id': int(params['chat_id']), 'type': 'private'},
+                'text': params['text']
+            }}
+
+        return 404, {'ok': False, 'error_code': 404, 'description': 'Not Found'}
+
+    def _make_handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+                if self.headers.get('Content-Type', '').startswith('application/json'):
+                    params = json.loads(body or '{}')
+                else:
+                    params = {k: v[0] for k, v in parse_qs(body).items()}
+                status, payload = api.handle(self.path.rsplit('/', 1)[-1], params)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client went away, e.g. a benchmarked bot was stopped mid-poll
+                    pass
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,245 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from telegram import Bot
+from telegram.error import BadRequest
+
+import broadcast
+from fake_bot_api import FakeBotAPI, FakeStore
+
+
+class CrashingStore(FakeStore):
+    def __init__(self, count, crash_after=None):
+        super().__init__(count)
+        self.crash_after = crash_after
+
+    def iter_user_ids(self, offset=0):
+        for index, user_id in enumerate(super().iter_user_ids(offset), start=offset):
+            if index == self.crash_after:
+                raise RuntimeError("simulated crash")
+            yield user_id
+
+
+@pytest.fixture
+def api():
+    api = FakeBotAPI().start()
+    yield api
+    api.stop()
+
+
+def run(api, store, progress=None, progress_file=None):
+    async def go():
+        async with Bot('123:fake', base_url=api.base_url) as bot:
+            return await broadcast.run_broadcast(
+                bot, store, "📣 Promo", progress=progress,
+                scheduler=broadcast.SendScheduler(global_rate=1000),
+                progress_file=progress_file
+            )
+    return asyncio.run(go())
+
+
+def test_token_bucket_paces_sends():
+    async def go():
+        bucket = broadcast.TokenBucket(rate=50)
+        started = time.monotonic()
+        for _ in range(11):
+            await bucket.acquire()
+        return time.monotonic() - started
+    # One token up front, then 10 more at 50/s
+    assert asyncio.run(go()) >= 0.18
+
+
+def test_idle_chat_buckets_are_dropped():
+    class NullBot:
+        async def send_message(self, chat_id, text):
+            pass
+
+    async def go():
+        scheduler = broadcast.SendScheduler(global_rate=500, per_chat_rate=100)
+        for chat_id in range(300):
+            assert await scheduler.send_message(NullBot(), chat_id, "📣 Promo")
+        return scheduler
+    scheduler = asyncio.run(go())
+    assert len(scheduler.chat_buckets) <= broadcast.MAX_CHAT_BUCKETS
+
+
+def test_resume_after_crash_delivers_each_message_once(api, tmp_path):
+    progress_file = str(tmp_path / broadcast.PROGRESS_FILE)
+    store = CrashingStore(100, crash_after=70)
+
+    with pytest.raises(RuntimeError):
+        run(api, store, progress_file=progress_file)
+
+    # The batch in flight at the crash is not checkpointed
+    progress = broadcast.load_progress(progress_file)
+    assert progress['offset'] == 60
+    assert progress['sent'] == 60
+
+    store.crash_after = None
+    result = run(api, store, progress=progress, progress_file=progress_file)
+
+    assert result['offset'] == 100
+    assert result['sent'] == 100
+    chat_ids = [chat_id for chat_id, _ in api.messages]
+    assert sorted(chat_ids) == [int(user_id) for user_id in store.users]
+    assert broadcast.load_progress(progress_file) is None
+
+
+def test_stop_between_batches_keeps_checkpoint(api, tmp_path):
+    progress_file = str(tmp_path / broadcast.PROGRESS_FILE)
+    store = FakeStore(100)
+
+    async def go():
+        async with Bot('123:fake', base_url=api.base_url) as bot:
+            return await broadcast.run_broadcast(
+                bot, store, "📣 Promo",
+                scheduler=broadcast.SendScheduler(global_rate=1000),
+                progress_file=progress_file,
+                should_stop=lambda: len(api.messages) >= 30
+            )
+
+    with pytest.raises(broadcast.BroadcastInterrupted):
+        asyncio.run(go())
+
+    # Stops at the batch boundary, nothing from the next batch is sent
+    assert len(api.messages) == 30
+    progress = broadcast.load_progress(progress_file)
+    assert progress['offset'] == 30
+
+    result = run(api, store, progress=progress, progress_file=progress_file)
+    assert result['sent'] == 100
+    assert len(api.messages) == len(set(api.messages)) == 100
+
+
+def test_failed_batch_records_delivered_users(tmp_path):
+    progress_file = str(tmp_path / broadcast.PROGRESS_FILE)
+    sent = []
+
+    class FlakyBot:
+        fail = True
+
+        async def send_message(self, chat_id, text):
+            if chat_id == 100003 and self.fail:
+                raise BadRequest("Can't parse entities")
+            sent.append(chat_id)
+
+    bot = FlakyBot()
+    store = FakeStore(10)
+
+    with pytest.raises(BadRequest):
+        asyncio.run(broadcast.run_broadcast(bot, store, "📣 Promo", progress_file=progress_file,
+                                            scheduler=broadcast.SendScheduler(global_rate=1000)))
+
+    progress = broadcast.load_progress(progress_file)
+    assert progress['offset'] == 0
+    assert progress['sent'] == 9
+    assert len(progress['batch_done']) == 9
+
+    bot.fail = False
+    result = asyncio.run(broadcast.run_broadcast(bot, store, "📣 Promo", progress=progress, progress_file=progress_file,
+                                                 scheduler=broadcast.SendScheduler(global_rate=1000)))
+    assert result['sent'] == 10
+    assert 'batch_done' not in result
+    assert sorted(sent) == [int(user_id) for user_id in store.users]
+
+
+def test_flood_control_is_retried(tmp_path):
+    api = FakeBotAPI(flood_every=10, retry_after=1).start()
+    try:
+        result = run(api, FakeStore(25), progress_file=str(tmp_path / broadcast.PROGRESS_FILE))
+    finally:
+        api.stop()
+
+    assert result['sent'] == 25
+    assert result['failed'] == 0
+    # Two 429 answers, each retried once
+    assert api.requests == 27
+    assert len(api.messages) == len(set(api.messages)) == 25
+
+
+class FakeMessage:
+    def __init__(self, text):
+        self.text = text
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+class FakeApplication:
+    running = True
+
+    def __init__(self):
+        self.tasks = []
+
+    def create_task(self, coroutine, update=None):
+        self.tasks.append(coroutine)
+
+
+@pytest.fixture
+def command(monkeypatch, tmp_path):
+    """Run /broadcast through handle_broadcast with run_broadcast recorded instead of sent"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('ADMIN_IDS', '42')
+    runs = []
+
+    async def fake_run_broadcast(bot, casino, text, progress=None, **kwargs):
+        runs.append((text, progress))
+        return {'sent': len(casino.users), 'failed': 0}
+    monkeypatch.setattr(broadcast, 'run_broadcast', fake_run_broadcast)
+
+    def send(text, user_id=42):
+        message = FakeMessage(text)
+        # Edited commands arrive without update.message
+        update = SimpleNamespace(effective_user=SimpleNamespace(id=user_id), effective_message=message, message=None)
+        context = SimpleNamespace(bot=None, bot_data={}, application=FakeApplication())
+
+        async def go():
+            await broadcast.handle_broadcast(update, context, FakeStore(3))
+            for task in context.application.tasks:
+                await task
+        asyncio.run(go())
+        return message.replies
+    send.runs = runs
+    return send
+
+
+def test_command_keeps_multiline_text(command):
+    command("/broadcast\n🎉 Big promo today\nDetails")
+    assert command.runs == [("🎉 Big promo today\nDetails", None)]
+
+
+def test_command_ignores_non_admins(command):
+    assert command("/broadcast hello", user_id=7) == []
+    assert command.runs == []
+
+
+def test_command_rejects_too_long_text(command):
+    replies = command("/broadcast " + "x" * 5000)
+    assert command.runs == []
+    assert "too long" in replies[0]
+
+
+def test_command_refuses_new_broadcast_while_unfinished(command):
+    broadcast.save_progress({'text': "Old promo", 'offset': 60, 'sent': 60, 'failed': 0})
+    replies = command("/broadcast New promo")
+    assert command.runs == []
+    assert "/broadcast resume" in replies[0]
+    assert broadcast.load_progress()['offset'] == 60
+
+
+def test_command_resume_uses_saved_text(command):
+    progress = {'text': "Old promo", 'offset': 60, 'sent': 60, 'failed': 0}
+    broadcast.save_progress(progress)
+    command("/broadcast\nresume")
+    assert command.runs == [("Old promo", progress)]
+
+
+def test_command_discard_clears_checkpoint(command):
+    broadcast.save_progress({'text': "Old promo", 'offset': 60, 'sent': 60, 'failed': 0})
+    command("/broadcast discard")
+    assert broadcast.load_progress() is None
+    command("/broadcast New promo")
+    assert command.runs == [("New promo", None)]
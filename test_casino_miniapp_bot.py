@@ -0,0 +1,58 @@
+import sys
+import threading
+
+import pytest
+
+import casino_miniapp_bot
+from casino_store import CasinoBot
+
+
+class FakeApplication:
+    def __init__(self):
+        self.polling = False
+
+    def run_polling(self, **kwargs):
+        self.polling = True
+
+
+@pytest.fixture
+def main(monkeypatch, tmp_path):
+    """Run main() with the given argv against a temporary store and a fake Application"""
+    store = CasinoBot()
+    store.data_file = str(tmp_path / 'casino_data.json')
+    application = FakeApplication()
+    monkeypatch.setattr(casino_miniapp_bot, 'casino', store)
+    monkeypatch.setattr(casino_miniapp_bot, 'BOT_TOKEN', '123:fake')
+    monkeypatch.setattr(casino_miniapp_bot, 'build_application', lambda: application)
+
+    def run(*args):
+        monkeypatch.setattr(sys, 'argv', ['casino_miniapp_bot.py', *args])
+        casino_miniapp_bot.main()
+        return application
+    run.store = store
+    yield run
+    if store._lock_file is not None:
+        store._lock_file.close()
+
+
+def test_unknown_role_exits_with_error(main):
+    with pytest.raises(SystemExit) as exc_info:
+        main('worker')
+    assert exc_info.value.code != 0
+
+
+def test_bot_role_does_not_import_web(main, monkeypatch):
+    monkeypatch.delitem(sys.modules, 'casino_web', raising=False)
+    assert main('bot').polling
+    assert 'casino_web' not in sys.modules
+    # Data is still loaded lazily, only the file lock is taken at startup
+    assert main.store._users is None
+
+
+def test_default_role_starts_web_server(main, monkeypatch):
+    import casino_web
+    started = threading.Event()
+    monkeypatch.setattr(casino_web, 'run_flask', started.set)
+
+    assert main().polling
+    assert started.wait(5)
@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+
+import pytest
+
+import casino_store
+from casino_store import CasinoBot
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CasinoBot()
+    store.data_file = str(tmp_path / 'casino_data.json')
+    yield store
+    if store._lock_file is not None:
+        store._lock_file.close()
+
+
+def test_users_load_on_first_access(store):
+    with open(store.data_file, 'w') as f:
+        json.dump({'1': {'balance': 1290}}, f)
+
+    assert store._users is None
+    assert store.users == {'1': {'balance': 1290}}
+    assert store.get_user(1)['balance'] == 1290
+
+
+def test_first_load_happens_once_across_threads(store, monkeypatch):
+    loads = []
+
+    def slow_load():
+        loads.append(threading.current_thread().name)
+        time.sleep(0.05)
+        store._users = {}
+    monkeypatch.setattr(store, 'load_data', slow_load)
+
+    barrier = threading.Barrier(8)
+
+    def first_access():
+        barrier.wait()
+        store.users
+
+    threads = [threading.Thread(target=first_access) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+
+
+@pytest.mark.skipif(casino_store.fcntl is None, reason="advisory locks need fcntl")
+def test_second_claim_on_same_file_fails(store):
+    store.claim_data_file()
+    store.claim_data_file()  # Same process, already held
+
+    other = CasinoBot()
+    other.data_file = store.data_file
+    with pytest.raises(RuntimeError, match="already in use"):
+        other.claim_data_file()
+    with pytest.raises(RuntimeError):
+        other.users